@@ -1,27 +1,36 @@
-import time, logging, struct
+import time, logging, threading
 from logger_setup import setup_logging
 import config
-from checksum import verify_checksum
+from checksum import CHECKSUM_TABLE
 from faults import TIMEOUT, CHKFAIL, RANGE, BUSOFF
 import pwm
 from can_iface import CanInterface
 from heartbeat import Heartbeat
 
+_rx_log = logging.getLogger("ABS")
+
+# Timing is kept in integer nanoseconds (time.monotonic_ns) on hot paths.
+TIMEOUT_NS = int(config.TIMEOUT_S * 1e9)
+RANGE_FAULT_HOLD_NS = int(config.RANGE_FAULT_HOLD_S * 1e9)
+
 def clamp(v, lo, hi):
     return max(lo, min(hi, v))
 
-def parse_cmd_frame(data: bytes):
+def parse_and_verify(data: bytes, _T=CHECKSUM_TABLE):
     """
     Byte0: Level (0..100)
     Byte1: RollingCounter (0..15)
     Byte2: Checksum
+    Returns (level, counter) for a valid frame, None if the frame is too
+    short, or False if the checksum does not match.
     """
     if len(data) < 3:
         return None
     level = data[0]
     counter = data[1] & 0x0F
-    checksum = data[2]
-    return level, counter, checksum
+    if _T[(level << 4) | counter] != data[2]:
+        return False
+    return level, counter
 
 def main():
     log = setup_logging(config.LOG_LEVEL)
@@ -35,59 +44,87 @@ def main():
     hb = Heartbeat(canif.send, config.HEARTBEAT_CAN_ID, config.HEARTBEAT_PERIOD_S)
     hb.start()
     # State
-    last_valid_rx = 0.0
+    last_valid_rx = 0         # monotonic ns
     last_counter = None
-    range_fault_until = 0.0
-    chk_fault_until = 0.0
+    range_fault_until = 0     # monotonic ns
+    chk_fault_until = 0       # monotonic ns
+    last_applied = -1       # last duty written to PWM; skip identical writes
+    wake = threading.Event()  # set by rx() on state change; wakes the main loop
+
+    # Hot-path locals for rx() (closure cells instead of global/attr lookups)
+    _mono = time.monotonic_ns
+    _set_duty = pwm.set_duty_cycle
+    _cmd_id = config.CMD_CAN_ID
+    _hold_ns = RANGE_FAULT_HOLD_NS
 
     def rx(msg):
-        nonlocal last_valid_rx, last_counter, range_fault_until, chk_fault_until
-        now = time.monotonic()
+        nonlocal last_valid_rx, last_counter, range_fault_until, chk_fault_until, last_applied
+        now = _mono()
         # Note: Using only standard frames
-        if msg.arbitration_id != config.CMD_CAN_ID:
+        if msg.arbitration_id != _cmd_id:
             return
-        parsed = parse_cmd_frame(msg.data)
-        if not parsed:
+        # Parse + verify checksum in one pass
+        parsed = parse_and_verify(msg.data)
+        if parsed is None:
             return
-        level, counter, checksum = parsed
-        # Verify checksum
-        from checksum import verify_checksum as vchk, make_checksum
-        if not vchk(level, counter, checksum):
-            chk_fault_until = now + config.RANGE_FAULT_HOLD_S
+        if parsed is False:
+            chk_fault_until = now + _hold_ns
+            wake.set()
             return
-        # Range clamp
-        applied = clamp(level, 0, 100)
+        level, counter = parsed
+        # Range clamp (level is a byte, so only the upper bound matters)
+        applied = 100 if level > 100 else level
         if applied != level:
-            range_fault_until = now + config.RANGE_FAULT_HOLD_S
+            range_fault_until = now + _hold_ns
         # Rolling counter discontinuity log (non-latching)
         if last_counter is not None:
             diff = (counter - last_counter) & 0x0F
             if diff not in (0,1):
-                logging.getLogger("ABS").warning("Counter jump: %d -> %d", last_counter, counter)
+                _rx_log.warning("Counter jump: %d -> %d", last_counter, counter)
         last_counter = counter
-        # Apply duty
-        pwm.set_duty_cycle(0,0,applied)
+        # Apply duty (only on change)
+        if applied != last_applied:
+            _set_duty(0,0,applied)
+            last_applied = applied
         last_valid_rx = now
+        wake.set()
 
     canif.on_receive(rx)
+    canif.on_fatal(lambda exc: wake.set())
 
     try:
         while True:
-            now = time.monotonic()
+            # RX thread is gone: leave via finally (safe state) with an error exit
+            if canif.failed is not None:
+                raise SystemExit("CAN receive thread failed: %r" % canif.failed)
+            now = time.monotonic_ns()
             # Timeout handling
             faults = 0
-            if (now - last_valid_rx) > config.TIMEOUT_S:
+            timeout_at = last_valid_rx + TIMEOUT_NS
+            if now > timeout_at:
                 faults |= TIMEOUT
-                pwm.set_duty_cycle(0,0,0)  # safe state
+                if last_applied != 0:
+                    pwm.set_duty_cycle(0,0,0)  # safe state
+                    last_applied = 0
+                deadline = None
+            else:
+                deadline = timeout_at
             # Transient faults
             if now < range_fault_until:
                 faults |= RANGE
+                deadline = range_fault_until if deadline is None else min(deadline, range_fault_until)
             if now < chk_fault_until:
                 faults |= CHKFAIL
+                deadline = chk_fault_until if deadline is None else min(deadline, chk_fault_until)
             # (BUSOFF would need can state read; omitted in this demo)
+            # Heartbeat thread publishes these on its own schedule
             hb.fault_bits = faults
-            hb.tick(now)
-            time.sleep(0.001)
+            # Sleep until the next deadline or until rx() signals a change
+            if deadline is None:
+                wake.wait()
+            else:
+                wake.wait(max(0, deadline - time.monotonic_ns()) / 1e9)
+            wake.clear()
     except KeyboardInterrupt:
         pass
     finally:
@@ -1,43 +1,73 @@
-import can, logging, threading, time
+import can, logging
 from typing import Optional, Callable
 
 log = logging.getLogger("ABS.CAN")
 
+class _RxListener(can.Listener):
+    """Routes Notifier events back to the owning CanInterface."""
+    def __init__(self, owner: "CanInterface"):
+        self._owner = owner
+
+    def on_message_received(self, msg: can.Message):
+        self._owner._on_msg(msg)
+
+    def on_error(self, exc: Exception):
+        # Called by the Notifier once its reader thread has died.
+        self._owner._on_fatal(exc)
+
 class CanInterface:
     """
     Thin wrapper around python-can / SocketCAN.
-    - Receives frames via a background thread calling a user callback.
+    - Receives frames via a can.Notifier reader thread that calls a user
+      callback as each frame arrives (no 10 ms poll loop).
     - Provides send() utility.
+    - If the reader thread dies, sets .failed and calls the on_fatal()
+      callback so the caller can go to a safe state and exit.
     """
     def __init__(self, channel: str):
         self.bus = can.interface.Bus(bustype="socketcan", channel=channel)
         self._rx_cb: Optional[Callable[[can.Message], None]] = None
-        self._stop = threading.Event()
-        self._thr = threading.Thread(target=self._rx_loop, name="can-rx", daemon=True)
-        self._thr.start()
+        self._fatal_cb: Optional[Callable[[Exception], None]] = None
+        self.failed: Optional[Exception] = None
+        self._tx_cache: dict[tuple[int, bool], can.Message] = {}
+        self._notifier = can.Notifier(self.bus, [_RxListener(self)])
 
     def on_receive(self, callback: Callable[[can.Message], None]):
         self._rx_cb = callback
 
+    def on_fatal(self, callback: Callable[[Exception], None]):
+        self._fatal_cb = callback
+
     def send(self, can_id: int, data: bytes, is_extended_id: bool=False):
-        msg = can.Message(arbitration_id=can_id, is_extended_id=is_extended_id, data=data)
+        # Reuse one Message per (id, ext); SocketCAN packs .data on every send.
+        key = (can_id, is_extended_id)
+        msg = self._tx_cache.get(key)
+        if msg is None:
+            msg = can.Message(arbitration_id=can_id, is_extended_id=is_extended_id, data=data)
+            self._tx_cache[key] = msg
+        else:
+            msg.data = data
+            msg.dlc = len(data)
         self.bus.send(msg)
 
-    def _rx_loop(self):
-        while not self._stop.is_set():
-            msg = self.bus.recv(timeout=0.01)  # 10 ms tick
-            if msg is None:
-                continue
-            if self._rx_cb:
-                try:
-                    self._rx_cb(msg)
-                except Exception as e:
-                    log.exception("RX callback error: %s", e)
+    def _on_msg(self, msg: can.Message):
+        if self._rx_cb:
+            # Only I/O/bus errors are expected here; anything else propagates,
+            # stops the Notifier and is reported through _on_fatal().
+            try:
+                self._rx_cb(msg)
+            except (OSError, can.CanError) as e:
+                log.exception("RX callback error: %s", e)
+
+    def _on_fatal(self, exc: Exception):
+        log.critical("CAN RX thread died", exc_info=exc)
+        self.failed = exc
+        if self._fatal_cb:
+            self._fatal_cb(exc)
 
     def shutdown(self):
-        self._stop.set()
         try:
-            self._thr.join(timeout=1.0)
+            self._notifier.stop(timeout=1.0)
         except Exception:
             pass
         try:
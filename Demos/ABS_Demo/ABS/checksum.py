@@ -1,9 +1,49 @@
 """
 Lightweight 8-bit checksum helpers.
 Checksum = 0xFF - ((Level + (Counter & 0x0F)) & 0xFF)
+
+Only 256 levels x 16 counters exist, so the per-frame helpers use a 4 KiB
+precomputed table indexed by (level << 4) | (counter & 0x0F).
+The batch verifier (offline log replay) imports NumPy/Numba on first use
+only, so the ECU never pays for them at startup. With Numba it is
+JIT-compiled; without it a vectorized NumPy table lookup is used.
 """
+
+# Public: abs_main's frame parser indexes it directly on the RX hot path
+CHECKSUM_TABLE = bytes((0xFF - ((l + (c & 0x0F)) & 0xFF)) & 0xFF for l in range(256) for c in range(16))
+
 def make_checksum(level: int, counter: int) -> int:
-    return (0xFF - ((int(level) + (int(counter) & 0x0F)) & 0xFF)) & 0xFF
+    return CHECKSUM_TABLE[((level & 0xFF) << 4) | (counter & 0x0F)]
 
 def verify_checksum(level: int, counter: int, checksum: int) -> bool:
-    return make_checksum(level, counter) == (checksum & 0xFF)
+    """level/counter/checksum are raw frame bytes (0..255)."""
+    return CHECKSUM_TABLE[((level & 0xFF) << 4) | (counter & 0x0F)] == (checksum & 0xFF)
+
+_verify_many_impl = None
+
+def _build_verify_many():
+    import numpy as np
+    try:
+        from numba import njit, prange
+    except ImportError:
+        table = np.frombuffer(CHECKSUM_TABLE, dtype=np.uint8)
+        def impl(levels, counters, checksums):
+            return table[((levels & 0xFF) << 4) | (counters & 0x0F)] == (checksums & 0xFF)
+        return impl
+
+    @njit(parallel=True, cache=True)
+    def impl(levels, counters, checksums):
+        n = levels.shape[0]
+        out = np.empty(n, dtype=np.bool_)
+        for i in prange(n):
+            out[i] = ((0xFF - ((levels[i] + (counters[i] & 0x0F)) & 0xFF)) & 0xFF) == (checksums[i] & 0xFF)
+        return out
+    return impl
+
+def verify_many(levels, counters, checksums):
+    """Batch verify (offline log replay). Returns a NumPy bool array."""
+    global _verify_many_impl
+    if _verify_many_impl is None:
+        _verify_many_impl = _build_verify_many()
+    import numpy as np
+    return _verify_many_impl(np.asarray(levels), np.asarray(counters), np.asarray(checksums))
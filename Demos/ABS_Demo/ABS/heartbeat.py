@@ -9,26 +9,37 @@ class Heartbeat:
     def __init__(self, can_send_fn, can_id: int, period_s: float, *, daemon: bool = True):
         self._send = can_send_fn
         self._can_id = can_id
-        self._period = float(period_s)
+        self._period_ns = int(period_s * 1e9)
         self._alive = 0
-        self._last = 0.0
+        self._last = 0              # monotonic ns of the last send
         self.fault_bits = 0
+        # Immutable 8-byte payloads memoized by (alive << 8) | fault_bits
+        self._payloads: dict[int, bytes] = {}
 
         self._stop_evt = threading.Event()
         self._thread: threading.Thread | None = None
         self._daemon = daemon
-        self._lock = threading.Lock()
 
-    def tick(self, now: float):
-        """Send a heartbeat if the period has elapsed."""
-        if (now - self._last) >= self._period:
-            data = bytearray(8)
-            data[0] = self._alive & 0xFF
-            data[1] = self.fault_bits & 0xFF
-            self._send(self._can_id, data)
+    def tick(self, now: int):
+        """Send a heartbeat if the period has elapsed (`now` in monotonic ns)."""
+        if (now - self._last) >= self._period_ns:
+            key = (self._alive << 8) | (self.fault_bits & 0xFF)
+            data = self._payloads.get(key)
+            if data is None:
+                data = self._payloads[key] = bytes((key >> 8, key & 0xFF, 0, 0, 0, 0, 0, 0))
+            try:
+                self._send(self._can_id, data)
+            except (OSError, can.CanError):
+                log.exception("Heartbeat send failed")
+                return
             self._alive = (self._alive + 1) & 0xFF
             self._last = now
 
+    @property
+    def next_due(self) -> int:
+        """Monotonic time (ns) at which the next heartbeat is due."""
+        return self._last + self._period_ns
+
     def start(self):
         """Start the background heartbeat thread (idempotent)."""
         if self._thread and self._thread.is_alive():
@@ -61,16 +72,10 @@ class Heartbeat:
         """
         try:
             while not self._stop_evt.is_set():
-                now = time.monotonic()
-                try:
-                    with self._lock:
-                        self.tick(now)
-                except Exception:
-                    log.exception("Heartbeat send failed")
+                self.tick(time.monotonic_ns())
 
                 # sleep until the next due time, but wake early if stopping
-                next_due = self._last + self._period
-                sleep_for = max(0.0, next_due - time.monotonic())
+                sleep_for = max(0, self.next_due - time.monotonic_ns()) / 1e9
 
                 # Event.wait returns early if stop is requested
                 # Use a tiny floor to avoid hot-spinning when period is ~0
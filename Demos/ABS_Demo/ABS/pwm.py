@@ -1,6 +1,13 @@
 import os
 import time
 
+# Per-(chip, channel) state populated by enable(): cached period, an open
+# duty_cycle fd and pre-encoded duty strings for integer percents 0..100,
+# so set_duty_cycle() is a single write() with no allocation.
+_period_ns: dict[tuple[int, int], int] = {}
+_duty_fd: dict[tuple[int, int], int] = {}
+_duty_str: dict[tuple[int, int], dict[int, bytes]] = {}
+
 def pwm_path(chip: int, channel: int) -> str:
     """Return the sysfs path for the given PWM chip/channel."""
     return f"/sys/class/pwm/pwmchip{chip}/pwm{channel}"
@@ -48,18 +55,32 @@ def enable(chip: int, channel: int, frequency_hz: float, duty_percent: float):
     with open(f"{pwm_dir}/enable", "w") as f:
         f.write("1")
 
+    key = (chip, channel)
+    _close_duty_fd(key)
+    _period_ns[key] = period_ns
+    _duty_str[key] = {p: b"%d" % int(period_ns * p / 100) for p in range(101)}
+    _duty_fd[key] = os.open(f"{pwm_dir}/duty_cycle", os.O_WRONLY)
+
 def set_duty_cycle(chip: int, channel: int, duty_percent: float):
-    """Update only the duty cycle (in %)."""
-    pwm_dir = pwm_path(chip, channel)
-    with open(f"{pwm_dir}/period", "r") as f:
-        period_ns = int(f.read().strip())
-    duty_cycle_ns = int(period_ns * (duty_percent / 100.0))
+    """Update only the duty cycle (in %). Requires a prior enable()."""
+    key = (chip, channel)
+    fd = _duty_fd[key]
+    duty = _duty_str[key].get(duty_percent)  # hits for whole percents (int or float)
+    if duty is None:
+        duty = b"%d" % int(_period_ns[key] * duty_percent / 100)
+    os.write(fd, duty)
+    os.lseek(fd, 0, os.SEEK_SET)
 
-    with open(f"{pwm_dir}/duty_cycle", "w") as f:
-        f.write(str(duty_cycle_ns))
+def _close_duty_fd(key: tuple[int, int]):
+    fd = _duty_fd.pop(key, None)
+    if fd is not None:
+        os.close(fd)
+    _period_ns.pop(key, None)
+    _duty_str.pop(key, None)
 
 def disable(chip: int, channel: int):
     """Disable PWM output."""
+    _close_duty_fd((chip, channel))
     pwm_dir = pwm_path(chip, channel)
     if os.path.exists(f"{pwm_dir}/enable"):
         with open(f"{pwm_dir}/enable", "w") as f:
@@ -18,11 +18,13 @@ def main():
 
     bus = can.Bus(interface="socketcan", channel=common.CAN_CHANNEL)
     print(f"Sending ~{fps:.0f} fps background frames... Ctrl-C to stop.")
+    # Payload content is irrelevant for bus loading: precompute a pool and cycle it
+    payloads = [random.randbytes(8) for _ in range(1024)]
     next_t = time.monotonic()
     rid = 0
     try:
         while True:
-            data = bytes(random.getrandbits(8) for _ in range(8))
+            data = payloads[rid & 1023]
             msg = can.Message(arbitration_id=0x300 + (rid % 0x100), is_extended_id=False, data=data)
             bus.send(msg)
             rid += 1
@@ -1,7 +1,7 @@
 """
 Shared helpers for the testbed (message building/checksum).
 """
-import can, time, itertools, random
+import can, time, itertools, random, struct
 from typing import Iterable
 
 CAN_CHANNEL = "can0"              # SocketCAN interface name
@@ -16,6 +16,8 @@ PWM_FREQ_HZ = 500                 # demo LED PWM target
 GPIO_CHIP = "/dev/gpiochip0"      # adjust as needed
 GPIO_LINE = 17                    # adjust to your LED GPIO offset
 
+_PACK_CMD = struct.Struct("<BBB5x").pack
+
 def make_checksum(level: int, counter: int) -> int:
     return (0xFF - ((int(level) + (int(counter) & 0x0F)) & 0xFF)) & 0xFF
 
@@ -25,9 +27,5 @@ def build_cmd(level: int, counter: int, bad_checksum=False) -> can.Message:
     cks = make_checksum(level, counter)
     if bad_checksum:
         cks ^= 0x5A  # corrupt
-    data = bytearray(8)
-    data[0] = level & 0xFF
-    data[1] = counter
-    data[2] = cks
-    # bytes 3..7 remain 0
+    data = _PACK_CMD(level & 0xFF, counter, cks)  # bytes 3..7 are zero padding
     return can.Message(arbitration_id=CMD_CAN_ID, is_extended_id=False, data=data)
@@ -2,10 +2,14 @@
 Pytest fixtures & helpers for ABS ECU requirement tests using only CAN heartbeat fault bits.
 Uses python-can / SocketCAN.
 """
+import ctypes
+import ctypes.util
 import threading
 import time
-import queue
+import select
+import struct
 import can
+import numpy as np
 import pytest
 
 # ---- Constants ----
@@ -24,6 +28,8 @@ RANGE_BIT   = 1 << 2
 BUSOFF_BIT  = 1 << 3
 
 # ---- Helpers ----
+_PACK_CMD = struct.Struct("<BBB5x").pack
+
 def make_checksum(level: int, counter: int) -> int:
     """Checksum = 0xFF - ((Level + (Counter & 0x0F)) & 0xFF)."""
     return (0xFF - ((int(level) + (int(counter) & 0x0F)) & 0xFF)) & 0xFF
@@ -35,55 +41,135 @@ def build_cmd(level: int, counter: int, *, bad_checksum: bool=False) -> can.Mess
     cks = make_checksum(level, ctr)
     if bad_checksum:
         cks ^= 0x5A  # corrupt
-    data = bytearray(8)
-    data[0] = level & 0xFF
-    data[1] = ctr
-    data[2] = cks
+    data = _PACK_CMD(level & 0xFF, ctr, cks)  # bytes 3..7 are zero padding
     return can.Message(arbitration_id=CMD_CAN_ID, is_extended_id=False, data=data)
 
+# Absolute-deadline sleep: clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME) via
+# libc, so periodic senders don't accumulate drift from relative sleeps.
+_libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+_TIMER_ABSTIME = 1
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+def sleep_until_ns(deadline_ns: int, _ts=_Timespec()):
+    """Sleep until `deadline_ns` on CLOCK_MONOTONIC (same clock as time.monotonic_ns)."""
+    _ts.tv_sec, _ts.tv_nsec = divmod(deadline_ns, 1_000_000_000)
+    _libc.clock_nanosleep(time.CLOCK_MONOTONIC, _TIMER_ABSTIME, ctypes.byref(_ts), None)
+
 # ---- Heartbeat watcher ----
+HB_DTYPE = np.dtype([("ts", "f8"), ("alive", "u1"), ("faults", "u1")])
+
 class HeartbeatWatcher:
     """Collect heartbeats (0x280) with timestamps in a background thread."""
+    RING_LEN = 4096
+
     def __init__(self, bus: can.Bus, hb_id: int):
         self.bus = bus
         self.hb_id = hb_id
-        self.q = queue.Queue()
+        # SPSC ring of HB_DTYPE records: the RX thread writes a slot and then
+        # bumps _tail; the test thread reads and bumps _head. Each index has a
+        # single writer, so no lock is needed; the Event only wakes the consumer.
+        self._ring = np.empty(self.RING_LEN, dtype=HB_DTYPE)
+        self._head = 0
+        self._tail = 0
+        self._wake = threading.Event()
         self._stop = threading.Event()
         self._thr = threading.Thread(target=self._run, daemon=True)
         self._thr.start()
 
     def _run(self):
-        while not self._stop.is_set():
-            msg = self.bus.recv(timeout=0.05)
-            if msg is None:
-                continue
-            if msg.arbitration_id == self.hb_id and len(msg.data) >= 2:
-                ts = time.monotonic()
-                alive = msg.data[0]
-                faults = msg.data[1]
-                self.q.put((ts, alive, faults, msg))
-
-    def get_many(self, min_count: int, timeout_s: float):
-        """Return at least `min_count` heartbeats within timeout."""
-        items = []
+        # Wait for readability on the SocketCAN fd, then drain every queued
+        # frame with non-blocking recv() before waiting again.
+        ep = select.epoll()
+        ep.register(self.bus.fileno(), select.EPOLLIN)
+        ring, n = self._ring, self.RING_LEN
+        try:
+            while not self._stop.is_set():
+                if not ep.poll(timeout=0.05):
+                    continue
+                while True:
+                    msg = self.bus.recv(timeout=0.0)
+                    if msg is None:
+                        break
+                    if msg.arbitration_id == self.hb_id and len(msg.data) >= 2:
+                        i = self._tail
+                        ring[i % n] = (time.perf_counter(), msg.data[0], msg.data[1])
+                        self._tail = i + 1
+                        self._wake.set()
+        finally:
+            ep.close()
+
+    def _available(self, timeout_s: float) -> int:
+        """Number of unread heartbeats, waiting up to `timeout_s` for at least one."""
+        if self._tail - self._head > self.RING_LEN:
+            self._head = self._tail - self.RING_LEN  # consumer fell a full lap behind
+        avail = self._tail - self._head
+        if avail == 0:
+            self._wake.clear()
+            # Re-check after clear so a write racing the clear is not missed
+            avail = self._tail - self._head
+            if avail == 0:
+                self._wake.wait(timeout_s)
+                avail = self._tail - self._head
+        return min(avail, self.RING_LEN)
+
+    def _peek(self, count: int) -> np.ndarray:
+        """Copy of the next `count` unread records (does not consume)."""
+        idx = np.arange(self._head, self._head + count) % self.RING_LEN
+        return self._ring[idx]
+
+    def get_many(self, min_count: int, timeout_s: float) -> np.ndarray:
+        """Return up to `min_count` heartbeats (HB_DTYPE array) collected within timeout."""
+        chunks = []
+        got = 0
         t_end = time.monotonic() + timeout_s
-        while len(items) < min_count and time.monotonic() < t_end:
-            try:
-                items.append(self.q.get(timeout=0.05))
-            except queue.Empty:
-                pass
-        return items
+        while got < min_count and time.monotonic() < t_end:
+            k = min(self._available(0.05), min_count - got)
+            if k:
+                chunks.append(self._peek(k))
+                self._head += k
+                got += k
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=HB_DTYPE)
+
+    def get_next(self, timeout_s: float):
+        """Return the next heartbeat (ts, alive, faults), or None on timeout."""
+        if not self._available(timeout_s):
+            return None
+        rec = self._ring[self._head % self.RING_LEN].item()
+        self._head += 1
+        return rec
 
     def get_until(self, predicate, timeout_s: float):
-        """Return first heartbeat satisfying predicate(ts, alive, faults, msg)."""
+        """Return first heartbeat (ts, alive, faults) satisfying predicate(ts, alive, faults)."""
         t_end = time.monotonic() + timeout_s
         while time.monotonic() < t_end:
-            try:
-                item = self.q.get(timeout=0.05)
-                if predicate(*item):
-                    return item
-            except queue.Empty:
-                pass
+            k = self._available(0.05)
+            if not k:
+                continue
+            batch = self._peek(k)
+            for j, rec in enumerate(batch.tolist()):
+                if predicate(*rec):
+                    self._head += j + 1
+                    return rec
+            self._head += k
+        return None
+
+    def wait_mask(self, fault_mask: int, want: int, timeout_s: float):
+        """Return first heartbeat (ts, alive, faults) with (faults & fault_mask) == want.
+        Evaluated on whole batches of the ring without a per-frame Python callback."""
+        t_end = time.monotonic() + timeout_s
+        while time.monotonic() < t_end:
+            k = self._available(0.05)
+            if not k:
+                continue
+            batch = self._peek(k)
+            hits = np.flatnonzero((batch["faults"] & fault_mask) == want)
+            if hits.size:
+                j = int(hits[0])
+                self._head += j + 1
+                return batch[j].item()
+            self._head += k
         return None
 
     def stop(self):
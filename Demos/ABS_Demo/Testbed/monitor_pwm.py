@@ -3,9 +3,21 @@ Measure PWM duty and frequency on a GPIO line using libgpiod v2.
 Requires the LED/PWM signal to be wired to this Pi's input line.
 """
 import argparse, time, statistics, gpiod
+import numpy as np
 from gpiod.line import Direction, Edge, Bias, Clock
 import common
 
+BUF_LEN = 16384  # edges buffered before folding into the window totals
+
+def edge_sums(ts_ns, typ):
+    """Sum/count of high and low intervals between consecutive edges.
+    typ[i] == 1 means edge i was rising, so interval i..i+1 is high."""
+    dt = np.diff(ts_ns) / 1e9
+    rising = typ[:-1] == 1
+    highs = dt[rising]
+    lows = dt[~rising]
+    return float(highs.sum()), highs.size, float(lows.sum()), lows.size
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--chip", default="/dev/gpiochip0")
@@ -19,10 +31,11 @@ def main():
 
     print("timestamp_s, freq_hz, duty_pct, samples")
     t_start = time.monotonic()
-    highs = []
-    lows = []
-    last_ts = None
-    last_val = None
+    ts_buf = np.empty(BUF_LEN, dtype=np.int64)
+    typ_buf = np.empty(BUF_LEN, dtype=np.uint8)
+    n = 0
+    h_sum = l_sum = 0.0
+    h_cnt = l_cnt = 0
 
     try:
         while True:
@@ -32,28 +45,25 @@ def main():
                 continue
             events = req.read_edge_events()
             for ev in events:
-                ts = ev.timestamp_ns / 1e9
-                # we don't read the level; estimate durations between edges
-                if last_ts is not None:
-                    dt = ts - last_ts
-                    # Alternate low/high estimates based on edge order
-                    if last_val == "HIGH":
-                        lows.append(dt)
-                        last_val = "LOW"
-                    else:
-                        highs.append(dt)
-                        last_val = "HIGH"
-                # Detect edge type to initialize last_val
-                if last_val is None:
-                    last_val = "HIGH" if str(ev.event_type).endswith("RISING_EDGE") else "LOW"
-                last_ts = ts
+                ts_buf[n] = ev.timestamp_ns
+                typ_buf[n] = ev.event_type == gpiod.EdgeEvent.Type.RISING_EDGE
+                n += 1
+                if n == BUF_LEN:
+                    hs, hc, ls, lc = edge_sums(ts_buf[:n], typ_buf[:n])
+                    h_sum += hs; h_cnt += hc; l_sum += ls; l_cnt += lc
+                    # keep the last edge so the next interval is not lost
+                    ts_buf[0] = ts_buf[n-1]; typ_buf[0] = typ_buf[n-1]; n = 1
 
             # Periodic report
             now = time.monotonic()
             if (now - t_start) >= args.window:
+                if n > 1:
+                    hs, hc, ls, lc = edge_sums(ts_buf[:n], typ_buf[:n])
+                    h_sum += hs; h_cnt += hc; l_sum += ls; l_cnt += lc
+                    ts_buf[0] = ts_buf[n-1]; typ_buf[0] = typ_buf[n-1]; n = 1
                 # Compute averages
-                h = sum(highs)/len(highs) if highs else 0.0
-                l = sum(lows)/len(lows) if lows else 0.0
+                h = h_sum/h_cnt if h_cnt else 0.0
+                l = l_sum/l_cnt if l_cnt else 0.0
                 period = h + l
                 if period > 0:
                     freq = 1.0 / period
@@ -61,8 +71,9 @@ def main():
                 else:
                     freq = 0.0
                     duty = 0.0
-                print(f"{now:.6f},{freq:.2f},{duty:.2f},{len(highs)+len(lows)}")
-                highs.clear(); lows.clear()
+                print(f"{now:.6f},{freq:.2f},{duty:.2f},{h_cnt+l_cnt}")
+                h_sum = l_sum = 0.0
+                h_cnt = l_cnt = 0
                 t_start = now
     except KeyboardInterrupt:
         pass
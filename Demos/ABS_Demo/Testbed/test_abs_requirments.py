@@ -6,18 +6,21 @@ Run:
     pytest -q
 """
 import time
-import statistics
-import threading
+import multiprocessing
+import socket
+import struct
+import numpy as np
 import pytest
-import can
 
 from conftest import (
-    CMD_PERIOD_S, HEARTBEAT_PERIOD_S,
+    CAN_CHANNEL, CMD_PERIOD_S, HEARTBEAT_PERIOD_S,
     TIMEOUT_S, RANGE_FAULT_HOLD_S,
     TIMEOUT_BIT, CHKFAIL_BIT, RANGE_BIT,
-    build_cmd
+    build_cmd, sleep_until_ns
 )
 
+_now = time.perf_counter_ns  # measurement clock; matches HeartbeatWatcher timestamps
+
 HB_WAIT = HEARTBEAT_PERIOD_S * 6 + 0.5
 MARGIN = 0.25  # seconds of timing slack for Linux scheduling
 
@@ -29,17 +32,17 @@ def test_heartbeat_presence_and_period(bus, hb):
     """REQ: F-6 — Heartbeat 0x280 present, correct period, alive counter stable."""
     items = hb.get_many(min_count=6, timeout_s=HB_WAIT)
     assert len(items) >= 3, "No heartbeat frames received"
-    periods = [items[i+1][0] - items[i][0] for i in range(len(items)-1)]
-    avg = sum(periods) / len(periods)
-    stdev = statistics.pstdev(periods) if len(periods) > 1 else 0.0
+    periods = np.diff(items["ts"])
+    avg = periods.mean()
+    stdev = periods.std() if len(periods) > 1 else 0.0
     assert 0.3 * HEARTBEAT_PERIOD_S <= avg <= 3.0 * HEARTBEAT_PERIOD_S, f"Unexpected heartbeat period {avg:.3f}s"
     assert stdev <= 0.5 * HEARTBEAT_PERIOD_S, f"Heartbeat jitter too high (stdev={stdev:.3f}s)"
 
     # Alive counter monotonic (mod 256)
-    alive = [a for _, a, _, _ in items]
-    for i in range(len(alive) - 1):
-        diff = (alive[i+1] - alive[i]) & 0xFF
-        assert diff in (0, 1), f"Alive counter jump: {alive[i]} -> {alive[i+1]}"
+    alive = items["alive"]
+    diffs = np.diff(alive.astype(np.int16)) & 0xFF
+    bad = np.flatnonzero(diffs > 1)
+    assert bad.size == 0, f"Alive counter jump: {alive[bad[0]]} -> {alive[bad[0]+1]}"
 
 
 # ----------------------------------------------------------------------
@@ -56,7 +59,7 @@ def test_checksum_rejection_sets_and_clears_chkfail(bus, hb, fresh_counter):
         bus.send(build_cmd(20, fresh_counter(), bad_checksum=True))
         time.sleep(CMD_PERIOD_S)
 
-    asserted = hb.get_until(lambda ts, a, f, m: f & CHKFAIL_BIT, HEARTBEAT_PERIOD_S + MARGIN)
+    asserted = hb.wait_mask(CHKFAIL_BIT, CHKFAIL_BIT, HEARTBEAT_PERIOD_S + MARGIN)
     assert asserted, "CHKFAIL not observed after bad frames"
 
     # Send valid frames to recover
@@ -64,7 +67,7 @@ def test_checksum_rejection_sets_and_clears_chkfail(bus, hb, fresh_counter):
         bus.send(build_cmd(50, fresh_counter()))
         time.sleep(CMD_PERIOD_S)
 
-    cleared = hb.get_until(lambda ts, a, f, m: not (f & CHKFAIL_BIT),
+    cleared = hb.wait_mask(CHKFAIL_BIT, 0,
                            RANGE_FAULT_HOLD_S + HEARTBEAT_PERIOD_S + MARGIN)
     assert cleared, "CHKFAIL did not clear within hold window"
 
@@ -78,7 +81,7 @@ def test_range_sets_and_clears_range_bit(bus, hb, fresh_counter):
         bus.send(build_cmd(130, fresh_counter()))
         time.sleep(CMD_PERIOD_S)
 
-    asserted = hb.get_until(lambda ts, a, f, m: f & RANGE_BIT, HEARTBEAT_PERIOD_S + MARGIN)
+    asserted = hb.wait_mask(RANGE_BIT, RANGE_BIT, HEARTBEAT_PERIOD_S + MARGIN)
     assert asserted, "RANGE bit not asserted"
 
     # Valid values to clear
@@ -86,7 +89,7 @@ def test_range_sets_and_clears_range_bit(bus, hb, fresh_counter):
         bus.send(build_cmd(80, fresh_counter()))
         time.sleep(CMD_PERIOD_S)
 
-    cleared = hb.get_until(lambda ts, a, f, m: not (f & RANGE_BIT),
+    cleared = hb.wait_mask(RANGE_BIT, 0,
                            RANGE_FAULT_HOLD_S + HEARTBEAT_PERIOD_S + MARGIN)
     assert cleared, "RANGE bit did not clear"
 
@@ -100,18 +103,18 @@ def test_timeout_asserts_and_recovers(bus, hb, fresh_counter):
         bus.send(build_cmd(60, fresh_counter()))
         time.sleep(CMD_PERIOD_S)
 
-    t_silence = time.monotonic()
+    t_silence = _now()
     time.sleep(TIMEOUT_S + 0.05)
 
-    asserted = hb.get_until(lambda ts, a, f, m: f & TIMEOUT_BIT, HEARTBEAT_PERIOD_S + MARGIN)
+    asserted = hb.wait_mask(TIMEOUT_BIT, TIMEOUT_BIT, HEARTBEAT_PERIOD_S + MARGIN)
     assert asserted, "TIMEOUT not observed"
-    latency = asserted[0] - t_silence
+    latency = asserted[0] - t_silence / 1e9
     assert latency >= TIMEOUT_S, f"Timeout asserted too early ({latency:.3f}s)"
     assert latency <= TIMEOUT_S + HEARTBEAT_PERIOD_S + MARGIN, f"Timeout asserted too late ({latency:.3f}s)"
 
     # Recovery
     bus.send(build_cmd(50, fresh_counter()))
-    cleared = hb.get_until(lambda ts, a, f, m: not (f & TIMEOUT_BIT), HEARTBEAT_PERIOD_S + MARGIN)
+    cleared = hb.wait_mask(TIMEOUT_BIT, 0, HEARTBEAT_PERIOD_S + MARGIN)
     assert cleared, "TIMEOUT did not clear after recovery"
 
 
@@ -127,43 +130,63 @@ def test_counter_jump_non_latching(bus, hb):
     bus.send(build_cmd(30, 7))  # discontinuity
 
     observed = hb.get_many(3, timeout_s=HEARTBEAT_PERIOD_S * 2 + 0.5)
-    for _, _, faults, _ in observed:
-        assert not (faults & (CHKFAIL_BIT | RANGE_BIT)), "Unexpected CHK/RANGE due to counter jump"
+    assert not (observed["faults"] & (CHKFAIL_BIT | RANGE_BIT)).any(), "Unexpected CHK/RANGE due to counter jump"
 
 
 # ----------------------------------------------------------------------
 # P-4: Robustness under bus load
 # ----------------------------------------------------------------------
-def test_no_false_faults_under_load(bus, hb, fresh_counter):
-    """REQ: P-4 — No RANGE/CHKFAIL under moderate background load."""
-    stop = threading.Event()
-
-    def background():
-        fps = 600.0  # ~60–70% bus utilization
-        period = 1.0 / fps
-        next_t = time.monotonic()
-        aid = 0x300
+# struct can_frame: can_id (u32, host order), len (u8), 3 pad/reserved, data[8]
+_CAN_FRAME = struct.Struct("=IB3x8s")
+_CAN_ID = struct.Struct("=I")
+
+def _background_load(channel: str, stop):
+    """
+    Background bus load, run in a child process on its own raw SocketCAN
+    socket: one preallocated can_frame buffer, only the ID is repacked per
+    send, so python-can's Message/Bus layers stay off the hot path.
+    Loopback is disabled so the test process' socket never sees this traffic.
+    """
+    sock = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+    sock.setsockopt(socket.SOL_CAN_RAW, socket.CAN_RAW_LOOPBACK, 0)
+    sock.bind((channel,))
+    aid = 0x300
+    buf = bytearray(_CAN_FRAME.pack(aid, 8, b"12345678"))
+    mv = memoryview(buf)
+    pack_id = _CAN_ID.pack_into
+    period_ns = 1_666_667  # ~600 fps, ~60–70% bus utilization
+    next_t_ns = time.monotonic_ns()
+    try:
         while not stop.is_set():
-            msg = can.Message(arbitration_id=aid, data=b"12345678", is_extended_id=False)
+            pack_id(buf, 0, aid)
             try:
-                bus.send(msg)
-            except can.CanError:
+                sock.send(mv)
+            except OSError:  # e.g. ENOBUFS when the TX queue is full
                 pass
             aid = 0x300 + ((aid + 1) & 0x7F)
-            next_t += period
-            time.sleep(max(0, next_t - time.monotonic()))
+            next_t_ns += period_ns
+            sleep_until_ns(next_t_ns)
+    finally:
+        sock.close()
 
-    t = threading.Thread(target=background, daemon=True)
-    t.start()
 
-    end = time.monotonic() + 2.0
-    while time.monotonic() < end:
-        bus.send(build_cmd(80, fresh_counter()))
-        hb_item = hb.get_until(lambda ts, a, f, m: True, HEARTBEAT_PERIOD_S + 0.2)
-        assert hb_item, "Missing heartbeat under load"
-        faults = hb_item[2]
-        assert not (faults & (RANGE_BIT | CHKFAIL_BIT)), f"Unexpected fault bits under load: 0x{faults:02X}"
-        time.sleep(CMD_PERIOD_S)
-
-    stop.set()
-    t.join(timeout=1.0)
+def test_no_false_faults_under_load(bus, hb, fresh_counter):
+    """REQ: P-4 — No RANGE/CHKFAIL under moderate background load."""
+    stop = multiprocessing.Event()
+    p = multiprocessing.Process(target=_background_load, args=(CAN_CHANNEL, stop), daemon=True)
+    p.start()
+
+    try:
+        end = _now() + 2_000_000_000  # 2 s
+        while _now() < end:
+            bus.send(build_cmd(80, fresh_counter()))
+            hb_item = hb.get_next(HEARTBEAT_PERIOD_S + 0.2)
+            assert hb_item, "Missing heartbeat under load"
+            faults = hb_item[2]
+            assert not (faults & (RANGE_BIT | CHKFAIL_BIT)), f"Unexpected fault bits under load: 0x{faults:02X}"
+            time.sleep(CMD_PERIOD_S)
+    finally:
+        stop.set()
+        p.join(timeout=1.0)
+        if p.is_alive():
+            p.terminate()
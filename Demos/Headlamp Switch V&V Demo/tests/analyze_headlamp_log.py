@@ -15,87 +15,102 @@ Config (tune to your spec):
 """
 
 import csv, sys
+from collections import namedtuple
+import numpy as np
 
 PRESS_TO_ON_MS = 30.0
 REL_TO_OFF_MS  = 30.0
 DEBOUNCE_MS    = 5.0
 MIN_PULSE_MS   = 5.0
 
+# Integer-ns forms used for all comparisons (ms only for messages)
+PRESS_TO_ON_NS = int(PRESS_TO_ON_MS * 1_000_000)
+REL_TO_OFF_NS  = int(REL_TO_OFF_MS * 1_000_000)
+DEBOUNCE_NS    = int(DEBOUNCE_MS * 1_000_000)
+MIN_PULSE_NS   = int(MIN_PULSE_MS * 1_000_000)
+
 SWITCH_NAME = "SWITCH"
 LAMP_NAME   = "LAMP"
 
 def ms(ns): return ns / 1_000_000.0
 
+Event = namedtuple("Event", "mono_ns level name event")
+
 def load(path):
-    rows = []
+    """Stream monitor.py CSV rows as Event tuples with typed fields."""
     with open(path, newline="") as f:
-        r = csv.reader(f)
-        header = None
-        for row in r:
-            if not row or row[0].startswith("#"): continue
-            if header is None:
-                header = row
+        rows = csv.reader(line for line in f if not line.startswith("#"))
+        header = next(rows, None)
+        if header is None:
+            return
+        Row = namedtuple("Row", header, rename=True)  # one class per file, no per-row dict
+        for row in rows:
+            if not row:
                 continue
-            rows.append(dict(zip(header, row)))
-    return rows
+            d = Row._make(row)
+            # Some rows (timeout/stop) have empty gpio/level; guard it
+            mono = int(d.mono_ns) if d.mono_ns else None
+            lvl = int(d.level) if d.level else None
+            yield Event(mono, lvl, d.name, d.event)
 
 def main(path):
-    rows = load(path)
-
-    # Normalize and filter
-    ev = []
-    for d in rows:
-        # Some rows (timeout/stop) have empty gpio/level; guard it
-        mono = int(d["mono_ns"]) if d["mono_ns"] else None
-        lvl = int(d["level"]) if d["level"] not in ("", None) else None
-        name = d["name"]
-        ev.append({"utc": d["utc"], "mono_ns": mono, "gpio": d["gpio"], "name": name,
-                   "event": d["event"], "level": lvl, "seq": int(d["seq"])})
-
-    sw = [e for e in ev if e["name"] == SWITCH_NAME and e["event"] in ("rising", "falling")]
-    lp = [e for e in ev if e["name"] == LAMP_NAME   and e["event"] in ("rising", "falling")]
+    # Single pass: keep only switch/lamp edges
+    sw, lp = [], []
+    for e in load(path):
+        if e.event not in ("rising", "falling"):
+            continue
+        if e.name == SWITCH_NAME:
+            sw.append(e)
+        elif e.name == LAMP_NAME:
+            lp.append(e)
 
     failures = []
 
-    # Debounce: collapse switch pulses < MIN_PULSE_MS (falling..rising pairs)
+    # Debounce: collapse switch pulses < MIN_PULSE_MS (falling..rising pairs).
+    # Vectorized so raw (non kernel-debounced) logs can be re-checked against
+    # any MIN_PULSE_MS. A press starts at the first falling edge of each run of
+    # falling edges (pull-up -> low) and ends at the next rising edge.
+    sw_ts = np.fromiter((e.mono_ns for e in sw), dtype=np.int64, count=len(sw))
+    falling = np.fromiter((e.event == "falling" for e in sw), dtype=bool, count=len(sw))
+    prev_falling = np.concatenate(([False], falling[:-1]))
+    starts = np.flatnonzero(falling & ~prev_falling)
+    rising_idx = np.flatnonzero(~falling)
+    pos = np.searchsorted(rising_idx, starts)
+    paired = pos < len(rising_idx)
+    starts = starts[paired]
+    ends = rising_idx[pos[paired]]
+    keep = (sw_ts[ends] - sw_ts[starts]) >= MIN_PULSE_NS
     stable = []
-    i = 0
-    while i < len(sw):
-        s = sw[i]
-        if s["event"] == "falling":  # press (pull-up -> low)
-            j = i + 1
-            while j < len(sw) and sw[j]["event"] != "rising":
-                j += 1
-            if j < len(sw) and sw[j]["mono_ns"] is not None and s["mono_ns"] is not None:
-                width_ms = ms(sw[j]["mono_ns"] - s["mono_ns"])
-                if width_ms >= MIN_PULSE_MS:
-                    stable.append(("press", s["mono_ns"]))
-                    stable.append(("release", sw[j]["mono_ns"]))
-                i = j + 1
-                continue
-        i += 1
-
-    # Timing checks relative to end of debounce window
+    for t_press, t_release in zip(sw_ts[starts[keep]].tolist(), sw_ts[ends[keep]].tolist()):
+        stable.append(("press", t_press))
+        stable.append(("release", t_release))
+
+    # Timing checks relative to end of debounce window.
+    # `stable` and the LAMP edges are both in monotonic order, so one forward
+    # cursor per lamp level finds each match in linear time overall.
+    lp_on  = [e.mono_ns for e in lp if e.mono_ns is not None and e.level == 1]
+    lp_off = [e.mono_ns for e in lp if e.mono_ns is not None and e.level == 0]
+    on_idx = off_idx = 0
     for kind, t_ns in stable:
-        target = t_ns + int(DEBOUNCE_MS * 1_000_000)
+        target = t_ns + DEBOUNCE_NS
         if kind == "press":
-            cand = next((e for e in lp if e["mono_ns"] is not None
-                         and e["mono_ns"] >= target and e["level"] == 1), None)
-            if not cand:
+            while on_idx < len(lp_on) and lp_on[on_idx] < target:
+                on_idx += 1
+            if on_idx == len(lp_on):
                 failures.append("No LAMP ON after press")
             else:
-                dt = ms(cand["mono_ns"] - target)
-                if dt > PRESS_TO_ON_MS:
-                    failures.append(f"Press→ON {dt:.2f} ms > {PRESS_TO_ON_MS} ms")
+                dt_ns = lp_on[on_idx] - target
+                if dt_ns > PRESS_TO_ON_NS:
+                    failures.append(f"Press→ON {ms(dt_ns):.2f} ms > {PRESS_TO_ON_MS} ms")
         else:
-            cand = next((e for e in lp if e["mono_ns"] is not None
-                         and e["mono_ns"] >= target and e["level"] == 0), None)
-            if not cand:
+            while off_idx < len(lp_off) and lp_off[off_idx] < target:
+                off_idx += 1
+            if off_idx == len(lp_off):
                 failures.append("No LAMP OFF after release")
             else:
-                dt = ms(cand["mono_ns"] - target)
-                if dt > REL_TO_OFF_MS:
-                    failures.append(f"Release→OFF {dt:.2f} ms > {REL_TO_OFF_MS} ms")
+                dt_ns = lp_off[off_idx] - target
+                if dt_ns > REL_TO_OFF_NS:
+                    failures.append(f"Release→OFF {ms(dt_ns):.2f} ms > {REL_TO_OFF_MS} ms")
 
     if failures:
         print("FAIL")
@@ -4,11 +4,15 @@ monitor.py — GPIO edge-event logger
 
 • Requests one or more input lines with BOTH edges + optional debounce.
 • Uses wait_edge_events() and read_edge_events() to capture events.
-• Writes auditable CSV with ISO UTC + monotonic_ns + gpio + name + event + level + seq.
+• Writes auditable CSV with monotonic_ns + gpio + name + event + level + seq.
+  No UTC is formatted per event: each run writes one comment row
+  "# utc_anchor=<iso> mono_anchor_ns=<ns>", so a row's UTC time is
+  utc_anchor + (mono_ns - mono_anchor_ns).
 • Adds heartbeat "timeout" rows when no events occur in the given interval.
 
 Examples:
   python3 monitor.py --line 27:SWITCH --line 17:LAMP --debounce_ms 5 --out gpio_log.csv
+  python3 monitor.py --line 27:SWITCH --line 17:LAMP --raw --out gpio_raw.csv
 """
 
 import argparse
@@ -21,6 +25,10 @@ from datetime import timedelta
 import gpiod
 from gpiod.line import Edge, Direction, Value
 
+FLUSH_EVERY = 256          # rows buffered between flushes while lines are busy
+EMA_ALPHA = 0.2            # smoothing for the inter-event spacing estimate
+MIN_TIMEOUT_S = 0.010      # floor for the adaptive wait timeout
+
 def now_iso_utc():
     return dt.datetime.utcnow().replace(tzinfo=dt.timezone.utc).isoformat()
 
@@ -40,8 +48,9 @@ def main():
     ap.add_argument("--chip", default="/dev/gpiochip0", help="path to gpiochip (default: /dev/gpiochip0)")
     ap.add_argument("--line", action="append", required=True, help="BCM line spec, e.g. 27:SWITCH (repeatable)")
     ap.add_argument("--debounce_ms", type=int, default=0, help="debounce period (ms) to apply per line (kernel-side)")
-    ap.add_argument("--timeout_ms", type=int, default=5000, help="poll timeout for heartbeat rows")
-    ap.add_argument("--max_batch_events", type=int, default=16, help="max events to drain per read")
+    ap.add_argument("--raw", action="store_true", help="log the raw edge stream (no kernel debounce); debounce offline in the analyzer")
+    ap.add_argument("--timeout_ms", type=int, default=5000, help="max poll timeout for heartbeat rows (shortened adaptively while events are frequent)")
+    ap.add_argument("--max_batch_events", type=int, default=1024, help="max events per read (bursts are drained with repeated reads)")
     ap.add_argument("--out", default="gpio_log.csv", help="output CSV path")
     args = ap.parse_args()
 
@@ -53,7 +62,7 @@ def main():
     line_settings = {}
     for off in offsets:
         ls = gpiod.LineSettings(direction=Direction.INPUT, edge_detection=Edge.BOTH)
-        if args.debounce_ms > 0:
+        if args.debounce_ms > 0 and not args.raw:
             # If the driver supports it, this will be applied; otherwise it may be ignored.
             ls.debounce_period = timedelta(milliseconds=args.debounce_ms)
         line_settings[off] = ls
@@ -64,11 +73,14 @@ def main():
 
         # Open CSV and emit headers
         first = not os.path.exists(args.out)
-        f = open(args.out, "a", newline="")
+        f = open(args.out, "a", newline="", buffering=1 << 16)  # 64 KiB userspace buffer
         w = csv.writer(f)
         if first:
             w.writerow([f"# started={now_iso_utc()} tool=monitor_v2.py version=2.0"])
-            w.writerow(["utc", "mono_ns", "gpio", "name", "event", "level", "seq"])
+            w.writerow(["mono_ns", "gpio", "name", "event", "level", "seq"])
+        # Wall-clock anchor for offline UTC reconstruction (one per run)
+        anchor_ns = time.monotonic_ns()
+        w.writerow([f"# utc_anchor={now_iso_utc()} mono_anchor_ns={anchor_ns}"])
 
         seq = 0
 
@@ -76,39 +88,61 @@ def main():
         for off in offsets:
             try:
                 v = req.get_value(off)
-                w.writerow([now_iso_utc(), time.monotonic_ns(), off, names_by_offset[off], "start",
+                w.writerow([time.monotonic_ns(), off, names_by_offset[off], "start",
                             1 if v == Value.ACTIVE else 0, seq]); seq += 1
             except Exception as e:
-                w.writerow([now_iso_utc(), time.monotonic_ns(), off, names_by_offset[off], "start_err",
+                w.writerow([time.monotonic_ns(), off, names_by_offset[off], "start_err",
                             "", seq]); seq += 1
         f.flush()
+        flushed_seq = seq
 
-        # Main event loop
-        timeout_s = args.timeout_ms / 1000.0
+        # Main event loop. Rows are flushed every FLUSH_EVERY rows or when the
+        # lines go idle (wait timeout), not after every event.
+        # The wait timeout adapts to an EMA of inter-event spacing: while lines
+        # are active, a gap of 2x the usual spacing is reported promptly; after
+        # a timeout it relaxes back to --timeout_ms.
+        max_timeout_s = args.timeout_ms / 1000.0
+        ema_ns = None
+        last_ev_ns = None
         try:
             while True:
+                if ema_ns is None:
+                    timeout_s = max_timeout_s
+                else:
+                    timeout_s = min(max_timeout_s, max(MIN_TIMEOUT_S, 2 * ema_ns / 1e9))
                 # Wait for any edge; returns True if something is pending
                 if req.wait_edge_events(timeout_s):
-                    events = req.read_edge_events(args.max_batch_events)
-                    for ev in events:
-                        # ev has: line_offset, event_type, timestamp_ns
-                        off = ev.line_offset
-                        et = "rising" if ev.event_type.name.lower().startswith("rising") else "falling"
-                        # Read current level right after event (best-effort)
-                        try:
-                            lev = req.get_value(off)
-                            lev_i = 1 if lev == Value.ACTIVE else 0
-                        except Exception:
-                            lev_i = ""
-                        w.writerow([now_iso_utc(), ev.timestamp_ns, off,
-                                    names_by_offset.get(off, f"GPIO{off}"), et, lev_i, seq]); seq += 1
-                    f.flush()
+                    while True:
+                        events = req.read_edge_events(args.max_batch_events)
+                        for ev in events:
+                            # ev has: line_offset, event_type, timestamp_ns
+                            if last_ev_ns is not None:
+                                gap = ev.timestamp_ns - last_ev_ns
+                                ema_ns = gap if ema_ns is None else ema_ns + EMA_ALPHA * (gap - ema_ns)
+                            last_ev_ns = ev.timestamp_ns
+                            off = ev.line_offset
+                            et = "rising" if ev.event_type.name.lower().startswith("rising") else "falling"
+                            # Read current level right after event (best-effort)
+                            try:
+                                lev = req.get_value(off)
+                                lev_i = 1 if lev == Value.ACTIVE else 0
+                            except Exception:
+                                lev_i = ""
+                            w.writerow([ev.timestamp_ns, off,
+                                        names_by_offset.get(off, f"GPIO{off}"), et, lev_i, seq]); seq += 1
+                        # Drain the whole burst before waiting again (read blocks if empty)
+                        if len(events) < args.max_batch_events or not req.wait_edge_events(0):
+                            break
+                    if seq - flushed_seq >= FLUSH_EVERY:
+                        f.flush(); flushed_seq = seq
                 else:
-                    # Heartbeat timeout
-                    w.writerow([now_iso_utc(), time.monotonic_ns(), "", "ALL", "timeout", "", seq]); seq += 1
-                    f.flush()
+                    # Heartbeat timeout; back to the full timeout until events resume
+                    w.writerow([time.monotonic_ns(), "", "ALL", "timeout", "", seq]); seq += 1
+                    f.flush(); flushed_seq = seq
+                    ema_ns = None
+                    last_ev_ns = None
         except KeyboardInterrupt:
-            w.writerow([now_iso_utc(), time.monotonic_ns(), "", "ALL", "stop", "", seq]); seq += 1
+            w.writerow([time.monotonic_ns(), "", "ALL", "stop", "", seq]); seq += 1
         finally:
             f.flush(); f.close()
 
@@ -36,10 +36,8 @@ DUT_BUTTON_GPIO = 27
 DUT_LED_GPIO = 17
 
 # Timing (tune if needed to match DUT loop/usleep)
-SETTLE_S = float(os.getenv("SETTLE_S", "0.15"))  # allow DUT to observe change
-RETRIES = int(os.getenv("RETRIES", "5"))
-RETRY_DELAY_S = float(os.getenv("RETRY_DELAY_S", "0.05"))
-STABILIZE_S = float(os.getenv("STABILIZE_S", "0.05"))
+SETTLE_S = float(os.getenv("SETTLE_S", "0.15"))  # initial settle before the first check
+EDGE_TIMEOUT_S = float(os.getenv("EDGE_TIMEOUT_S", "0.5"))  # max wait for the LED edge
 
 # ----------------------------- gpiod helpers ------------------------------
 
@@ -98,22 +96,41 @@ def request_input(chip: gpiod.Chip, line_num: int) -> gpiod.LineRequest:
     req = chip.request_lines(config={line_num: settings}, consumer="pytest-led-button")
     return req
 
+def request_input_edges(chip: gpiod.Chip, line_num: int) -> gpiod.LineRequest:
+    """Request a line as INPUT with BOTH edge detection (kernel-timestamped events).
+
+    Returns the LineRequest object (caller must call .release()).
+    """
+    settings = gpiod.LineSettings(direction=gpiod.line.Direction.INPUT,
+                                  edge_detection=gpiod.line.Edge.BOTH)
+    req = chip.request_lines(config={line_num: settings}, consumer="pytest-led-button")
+    return req
+
 def read_input_from_request(req: gpiod.LineRequest, line: int) -> int:
     """Read a single logical value (0/1) from a LineRequest for a line offset."""
     v = req.get_value(line)
     return _value_to_int(v)
 
-def sample_led(chip: gpiod.Chip) -> int:
-    """One-shot sample of DUT LED level via the sense pin.
+def drain_edge_events(req: gpiod.LineRequest) -> None:
+    """Discard queued edge events so a following wait only sees new edges."""
+    while req.wait_edge_events(0):
+        req.read_edge_events()
 
-    Requests the sense line as INPUT, reads it, then releases.
+def wait_led(req: gpiod.LineRequest, line: int, want: int, timeout_s: float) -> int:
+    """Block on edge events until the sensed level equals `want` or the timeout expires.
+
+    Returns the last level seen (from the newest edge, or a direct read if none arrived).
     """
-    req = request_input(chip, TB_GPIO_SENSE)
-    try:
-        time.sleep(STABILIZE_S)
-        return read_input_from_request(req, TB_GPIO_SENSE)
-    finally:
-        req.release()
+    deadline = time.monotonic() + timeout_s
+    level = read_input_from_request(req, line)
+    while level != want:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not req.wait_edge_events(remaining):
+            break
+        events = req.read_edge_events()
+        if events:
+            level = 1 if events[-1].event_type == gpiod.EdgeEvent.Type.RISING_EDGE else 0
+    return level
 
 # ------------------------------- Fixtures ---------------------------------
 
@@ -122,10 +139,17 @@ def tb_chip():
     with open_chip(TB_GPIOCHIP_NAME) as chip:
         yield chip
 
+@pytest.fixture(scope="module")
+def tb_sense(tb_chip):
+    """Sense line requested once as INPUT with edge events; tests wait on LED edges."""
+    req = request_input_edges(tb_chip, TB_GPIO_SENSE)
+    yield req
+    req.release()
+
 # -------------------------------- Tests -----------------------------------
 
 @pytest.mark.timeout(15)
-def test_led_follows_press_and_release(tb_chip):
+def test_led_follows_press_and_release(tb_chip, tb_sense):
     """
     Sequence:
       1) Release (TB high-Z): expect LED OFF (0)
@@ -136,48 +160,27 @@ def test_led_follows_press_and_release(tb_chip):
     # ---- Step 1: Release (TB high-Z) ----
     rel = request_input(tb_chip, TB_GPIO_PRESS)  # high-Z on TB -> DUT sees pull-up (1)
     try:
-        time.sleep(SETTLE_S)
-        off_seen = False
-        last = None
-        for _ in range(RETRIES):
-            last = sample_led(tb_chip)
-            if last == 0:
-                off_seen = True
-                break
-            time.sleep(RETRY_DELAY_S)
-        assert off_seen, f"Expected LED OFF (0) when released; last read {last}"
+        time.sleep(SETTLE_S)  # single initial settle; later steps wait on edges
+        last = wait_led(tb_sense, TB_GPIO_SENSE, 0, EDGE_TIMEOUT_S)
+        assert last == 0, f"Expected LED OFF (0) when released; last read {last}"
     finally:
         rel.release()
 
     # ---- Step 2: Press (TB drives LOW) ----
+    drain_edge_events(tb_sense)
     press_req = request_output_low(tb_chip, TB_GPIO_PRESS)  # drive low -> DUT reads 0 (pressed)
     try:
         # NOTE: We intentionally keep the request active for the duration of the "press".
-        time.sleep(SETTLE_S)
-        on_seen = False
-        last = None
-        for _ in range(RETRIES):
-            last = sample_led(tb_chip)
-            if last == 1:
-                on_seen = True
-                break
-            time.sleep(RETRY_DELAY_S)
-        assert on_seen, f"Expected LED ON (1) when pressed; last read {last}"
+        last = wait_led(tb_sense, TB_GPIO_SENSE, 1, EDGE_TIMEOUT_S)
+        assert last == 1, f"Expected LED ON (1) when pressed; last read {last}"
     finally:
         press_req.release()
 
     # ---- Step 3: Release again (TB high-Z) ----
+    drain_edge_events(tb_sense)
     rel2 = request_input(tb_chip, TB_GPIO_PRESS)
     try:
-        time.sleep(SETTLE_S)
-        off_again = False
-        last = None
-        for _ in range(RETRIES):
-            last = sample_led(tb_chip)
-            if last == 0:
-                off_again = True
-                break
-            time.sleep(RETRY_DELAY_S)
-        assert off_again, f"Expected LED OFF (0) after release; last read {last}"
+        last = wait_led(tb_sense, TB_GPIO_SENSE, 0, EDGE_TIMEOUT_S)
+        assert last == 0, f"Expected LED OFF (0) after release; last read {last}"
     finally:
         rel2.release()
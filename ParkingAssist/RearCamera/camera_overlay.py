@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
+import os
+import functools
 import cv2
 import time
+import threading
 import numpy as np
 from picamera2 import Picamera2
+from libcamera import Transform
 
 # Local imports
 from udp_server import DistanceReceiver
-from object_detection import detect_candidates
-from sensor_fusion import fuse_vision_ultrasonic
+from object_detection import Detector
+from sensor_fusion import fuse_vision_ultrasonic, ASSOC_HOLD_SEC
 
 # ---------- Config ----------
 WINDOW_NAME = "Parking Assist"
@@ -15,15 +19,58 @@ CAP_W = 800
 CAP_H = 500
 BRAKE_THRESHOLD_MM = 300
 ROTATE_180 = True   # set False if not needed
+DETECT_SCALE = 2    # run detection at CAP_W/2 x CAP_H/2, draw on the full frame
+DETECT_MIN_AREA = 200  # px at detection scale (800 at full scale / 4)
+MAIN_CPUS = {0, 1}  # capture/render thread cores (UDP listener: udp_server.UDP_CPU)
+CV_THREADS = 2      # OpenCV worker threads (Pi 4: leave cores for capture/UI/UDP)
+DISPLAY_EVERY = 2   # render/pump the GUI every Nth frame; detection + fusion run on all
+
+# pollKey (OpenCV >= 4.5) pumps GUI events without waitKey's 1 ms minimum sleep
+_poll_key = getattr(cv2, "pollKey", None) or (lambda: cv2.waitKey(1))
+
+# ---------- Pre-rendered labels ----------
+def make_label(text, font, scale, color, thickness, line_type=cv2.LINE_8):
+    """Rasterize `text` once. Returns (bgr, mask, pad, ascent, advance) for blit_label()."""
+    (tw, th), base = cv2.getTextSize(text, font, scale, thickness)
+    # getTextSize pads the width for thickness; the pen advance is what
+    # appending a character adds, so text drawn after the sprite lines up
+    advance = cv2.getTextSize(text + "0", font, scale, thickness)[0][0] - \
+              cv2.getTextSize("0", font, scale, thickness)[0][0]
+    pad = thickness
+    img = np.zeros((th + base + 2*pad, tw + 2*pad, 3), np.uint8)
+    cv2.putText(img, text, (pad, th + pad), font, scale, color, thickness, line_type)
+    return img, img.any(axis=2), pad, th, advance
+
+def blit_label(frame, label, x, y):
+    """Copy a make_label() sprite so its text origin lands at (x, y), like putText. Returns x after the text."""
+    img, mask, pad, th, advance = label
+    x0, y0 = x - pad, y - th - pad
+    fh, fw = frame.shape[:2]
+    sx0, sy0 = max(0, -x0), max(0, -y0)
+    sx1, sy1 = min(img.shape[1], fw - x0), min(img.shape[0], fh - y0)
+    if sx0 < sx1 and sy0 < sy1:
+        np.copyto(frame[y0+sy0:y0+sy1, x0+sx0:x0+sx1], img[sy0:sy1, sx0:sx1],
+                  where=mask[sy0:sy1, sx0:sx1, None])
+    return x + advance
+
+FUSED_LABEL = make_label("Fused: ", cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,0,0), 2)
+BRAKE_LABEL = make_label("BRAKE WARNING!", cv2.FONT_HERSHEY_DUPLEX, 1.0, (0,0,255), 3)
+ULTRA_LABEL = make_label("Ultrasonic: ", cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0,255,255), 2)
+
+@functools.lru_cache(maxsize=1)
+def _screen_size():
+    """Display resolution from the framebuffer (read once); 1920x1080 if unavailable."""
+    try:
+        with open("/sys/class/graphics/fb0/virtual_size") as f:
+            w, h = map(int, f.read().split(","))
+        return w, h
+    except (OSError, ValueError):
+        return 1920, 1080
 
 def center_window(window_name):
-    import tkinter as tk
-    # Get display resolution using tkinter (most reliable on Pi)
-    root = tk.Tk()
-    root.withdraw()  # Hide main tkinter window
-    screen_w = root.winfo_screenwidth()
-    screen_h = root.winfo_screenheight()
-    print(("screen resoulotion:",screen_w,screen_h))
+    # Startup only: never call per frame
+    screen_w, screen_h = _screen_size()
+    print(("screen resolution:",screen_w,screen_h))
 
     # Compute top-left corner for centering
     x = int((screen_w-CAP_W) / 2)
@@ -33,36 +80,140 @@ def center_window(window_name):
     cv2.resizeWindow(WINDOW_NAME, CAP_W, CAP_H)
     cv2.moveWindow(window_name, x, y)
 
+# ---------- Background detection + fusion ----------
+class FusionWorker:
+    """
+    Runs detection + fusion in a daemon thread so capture/render keep camera rate.
+    Single "latest wins" slot in each direction: a frame submitted while an
+    older one is still pending replaces it; result() is the newest fusion output
+    with the capture time it was computed for. If detection/fusion raises, the
+    thread stops and result() re-raises the error in the caller.
+    Downsampled frames come from a pool of 3 buffers (one being filled, one
+    pending, one in the detector), so nothing is copied or overwritten in use.
+    """
+    def __init__(self, detector, det_h, det_w):
+        self._detector = detector
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._free = [np.empty((det_h, det_w, 3), np.uint8) for _ in range(3)]
+        self._in = None
+        self._out = (None, float("-inf"))
+        self._error = None
+
+        t = threading.Thread(target=self._run, name="FusionWorker", daemon=True)
+        t.start()
+
+    def buffer(self):
+        """Free downsample buffer for the next submit()."""
+        with self._lock:
+            return self._free.pop()
+
+    def submit(self, frame, small, ultrasonic_mm, now):
+        """Queue `small` (from buffer()) for detection; fusion only reads `frame.shape`."""
+        with self._lock:
+            if self._in is not None:
+                self._free.append(self._in[1])   # dropped, never processed
+            self._in = (frame, small, ultrasonic_mm, now)
+        self._pending.set()
+
+    def result(self):
+        """Latest (fusion result dict or None, its submit time). Raises if the worker died."""
+        with self._lock:
+            if self._error is not None:
+                raise RuntimeError("FusionWorker failed") from self._error
+            return self._out
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            with self._lock:
+                item, self._in = self._in, None
+                self._pending.clear()
+            if item is None:
+                continue
+            frame, small, ultrasonic_mm, now = item
+
+            try:
+                # Detect on the downsampled frame, then map back to full-frame coordinates
+                candidates = self._detector.detect(small)
+                candidates[:, :4] *= DETECT_SCALE                   # x, y, w, h
+                candidates[:, 4] *= DETECT_SCALE * DETECT_SCALE     # area
+                fused = fuse_vision_ultrasonic(frame, candidates, ultrasonic_mm, now)
+            except Exception as e:
+                with self._lock:
+                    self._free.append(small)
+                    self._error = e
+                return
+
+            with self._lock:
+                self._free.append(small)
+                self._out = (fused, now)
+
 def main():
+    # OpenCV's SIMD paths need a NEON-enabled build on the Pi (apt python3-opencv
+    # is; some pip wheels are not). Parallel Canny/morphology use CV_THREADS.
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(min(CV_THREADS, os.cpu_count() or 1))
+    if os.uname().machine.startswith(("arm", "aarch64")) and "NEON" not in cv2.getBuildInformation():
+        print("warning: OpenCV build without NEON; install python3-opencv from apt for SIMD")
+
     # Start UDP distance receiver
     dist_receiver = DistanceReceiver()
 
     # Start camera
     picam2 = Picamera2()
-    preview_config = picam2.create_preview_configuration({"size": (CAP_W, CAP_H)})
+    # libcamera names formats by little-endian word order: "RGB888" arrays are
+    # [B, G, R] per pixel, i.e. already OpenCV BGR. The 180 degree rotation is
+    # done by the ISP via the transform, so no per-frame cvtColor/flip.
+    preview_config = picam2.create_preview_configuration(
+        main={"size": (CAP_W, CAP_H), "format": "RGB888"},
+        transform=Transform(hflip=1, vflip=1) if ROTATE_180 else Transform())
     picam2.configure(preview_config)
     picam2.start()
 
     cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_FULLSCREEN)
 
+    # Detection + fusion run on a worker thread over a downsampled copy
+    det_w, det_h = CAP_W // DETECT_SCALE, CAP_H // DETECT_SCALE
+    detector = Detector(det_h, det_w, min_area=DETECT_MIN_AREA)
+    worker = FusionWorker(detector, det_h, det_w)
+
+    # Pin only the main thread; it is done after the worker/receiver threads
+    # start so they do not inherit this mask. Restrict to cores we are allowed
+    # (cgroup cpusets) and treat a failed pin as non-fatal.
+    cpus = MAIN_CPUS & os.sched_getaffinity(0)
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            print(f"main: CPU pin to {sorted(cpus)} failed ({e}); running unpinned")
+
     print("Camera + Fusion started.")
 
+    frame_idx = 0
     while True:
-        frame_rgb = picam2.capture_array()
-        frame = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
+        frame = picam2.capture_array()  # BGR, already rotated
 
-        # Rotate if necessary
-        if ROTATE_180:
-            frame = cv2.flip(frame, -1)
+        now = time.monotonic()  # one clock read per frame
 
         # Get latest ultrasonic data
-        ultrasonic_mm = dist_receiver.get_distance()
+        ultrasonic_mm = dist_receiver.get_distance(now)
+
+        # Hand a downsampled copy to the worker (before any overlay is drawn)
+        small = worker.buffer()
+        cv2.resize(frame, (det_w, det_h), dst=small, interpolation=cv2.INTER_AREA)
+        worker.submit(frame, small, ultrasonic_mm, now)
 
-        # Detect candidates via vision
-        candidates = detect_candidates(frame)
+        # Newest fusion result (may trail the displayed frame by one detection);
+        # drop it once it is older than the association hold
+        fused, fused_t = worker.result()
+        if now - fused_t > ASSOC_HOLD_SEC:
+            fused = None
 
-        # Fuse ultrasonic + vision
-        fused = fuse_vision_ultrasonic(frame, candidates, ultrasonic_mm)
+        # Overlay + GUI only on displayed frames
+        frame_idx += 1
+        if frame_idx % DISPLAY_EVERY:
+            continue
 
         # Draw fusion results
         if fused is not None:
@@ -71,23 +222,23 @@ def main():
             cv2.rectangle(frame, (x,y), (x+w,y+h), (255,0,0), 3)
             cv2.circle(frame, (cx,cy), 5, (255,0,0), -1)
 
-            text = f"Fused: {fused['fused_distance_mm']} mm"
-            cv2.putText(frame, text, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX,
-                        0.7, (255,0,0), 2, cv2.LINE_AA)
+            # Static label parts are pre-rendered sprites; only the value is drawn per frame
+            tx = blit_label(frame, FUSED_LABEL, x, y-10)
+            cv2.putText(frame, f"{fused['fused_distance_mm']} mm", (tx, y-10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255,0,0), 2)
 
             if (fused['fused_distance_mm'] is not None) and (fused['fused_distance_mm'] < BRAKE_THRESHOLD_MM):
-                cv2.putText(frame, "BRAKE WARNING!", (x, y+h+30),
-                            cv2.FONT_HERSHEY_DUPLEX, 1.0, (0,0,255), 3)
+                blit_label(frame, BRAKE_LABEL, x, y+h+30)
 
         # Show ultrasonic only fallback
         if ultrasonic_mm is not None:
-            cv2.putText(frame, f"Ultrasonic: {ultrasonic_mm} mm",
-                        (30, 50), cv2.FONT_HERSHEY_SIMPLEX,
-                        1.0, (0,255,255), 2)
+            tx = blit_label(frame, ULTRA_LABEL, 30, 50)
+            cv2.putText(frame, f"{ultrasonic_mm} mm", (tx, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0,255,255), 2)
 
         cv2.imshow(WINDOW_NAME, frame)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if _poll_key() & 0xFF == ord('q'):
             break
 
     picam2.stop()
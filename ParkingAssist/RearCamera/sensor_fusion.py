@@ -1,5 +1,6 @@
 import time
 import math
+import numpy as np
 
 # Typical Pi Camera v2 horizontal FOV
 CAM_HFOV_DEG = 62.0
@@ -7,66 +8,82 @@ ASSOC_ANGLE_TOL_DEG = 20.0
 ASSOC_HOLD_SEC = 0.4
 
 # -------- Kalman Filter --------
-class Kalman1D:
-    def __init__(self, q=0.1, r=50.0, p=1.0, x=0.0):
-        self.q = q
-        self.r = r
-        self.p = p
-        self.x = x
+# 1-D filter as plain scalar functions over (x, p).
+KF_Q = 0.1    # process noise
+KF_R = 50.0   # measurement noise
+KF_P0 = 1.0   # initial covariance
 
-    def predict(self):
-        self.p += self.q
-        return self.x
+def kf_predict(p, q):
+    """Predict step: x is unchanged, returns the new covariance."""
+    return p + q
 
-    def update(self, z):
-        k = self.p / (self.p + self.r)
-        self.x = self.x + k*(z - self.x)
-        self.p = (1-k)*self.p
-        return self.x
+def kf_update(x, p, r, z):
+    """Update step with measurement z, returns (x, p)."""
+    k = p / (p + r)
+    x = x + k*(z - x)
+    p = (1-k)*p
+    return x, p
 
 # Global fusion state
-kalman = None
+kf_x = 0.0
+kf_p = KF_P0
 kalman_init = False
-last_assoc = {"time": 0, "bbox": None, "centroid": None}
+last_assoc = {"time": float("-inf"), "bbox": None, "centroid": None}
 
-def pixel_to_bearing(cx, width):
-    norm = (cx - width/2) / width
-    return norm * CAM_HFOV_DEG
+_gate_w = None
+_gate_px2 = 0
 
-def fuse_vision_ultrasonic(frame, candidates, ultrasonic_mm):
-    global kalman, kalman_init, last_assoc
+def assoc_gate_px2(width):
+    """Association tolerance as twice the pixel offset from image centre (cached per width)."""
+    global _gate_w, _gate_px2
+    if width != _gate_w:
+        _gate_px2 = math.floor(2 * ASSOC_ANGLE_TOL_DEG / CAM_HFOV_DEG * width)
+        _gate_w = width
+    return _gate_px2
+
+def fuse_vision_ultrasonic(frame, candidates, ultrasonic_mm, now=None):
+    """`now` is time.monotonic() for this frame; read here if not given."""
+    global kf_x, kf_p, kalman_init, last_assoc
 
     h, w = frame.shape[:2]
+    if now is None:
+        now = time.monotonic()
 
     # --- Kalman initialization / update ---
     if ultrasonic_mm is not None:
+        z = float(ultrasonic_mm)
         if not kalman_init:
-            kalman = Kalman1D(x=float(ultrasonic_mm))
+            kf_x, kf_p = z, KF_P0
             kalman_init = True
-        fused_distance = kalman.update(float(ultrasonic_mm))
+        kf_x, kf_p = kf_update(kf_x, kf_p, KF_R, z)
+        fused_distance = kf_x
     else:
         if kalman_init:
-            fused_distance = kalman.predict()
+            kf_p = kf_predict(kf_p, KF_Q)
+            fused_distance = kf_x
         else:
             fused_distance = None
 
-    # --- Compute bearing for each detected object ---
-    for c in candidates:
-        cx, cy = c['centroid']
-        c['bearing'] = pixel_to_bearing(cx, w)
-        x,y,wc,hc = c['bbox']
-        c['bottom'] = y + hc
-        c['score'] = c['area'] * 0.7 + (c['bottom']) * 0.3
-
-    # --- Angle-based association ---
-    beam_angle = 0.0
-    assoc = [c for c in candidates if abs(c['bearing'] - beam_angle) <= ASSOC_ANGLE_TOL_DEG]
+    # --- Angle-based association (beam at 0 deg) ---
+    # candidates: int32 array (N, 5) of x, y, w, h, area
+    # |bearing| <= ASSOC_ANGLE_TOL_DEG, with bearing = (cx - w/2) / w * CAM_HFOV_DEG,
+    # checked as an integer pixel gate;
+    # only gated rows are scored, so clutter outside the beam costs one compare.
+    cx = candidates[:, 0] + candidates[:, 2]//2
+    assoc = candidates[np.abs(2*cx - w) <= assoc_gate_px2(w)]
 
     chosen = None
-    if assoc:
-        chosen = max(assoc, key=lambda c: c['score'])
+    if len(assoc):
+        score = assoc[:, 4] * 0.7 + (assoc[:, 1] + assoc[:, 3]) * 0.3
+        idx = int(np.argmax(score))
+        bx, by, bw, bh = assoc[idx, :4].tolist()
+        chosen = {
+            "bbox": (bx, by, bw, bh),
+            "centroid": (bx + bw//2, by + bh//2),
+            "score": float(score[idx]),
+        }
     else:
-        if time.time() - last_assoc['time'] <= ASSOC_HOLD_SEC:
+        if now - last_assoc['time'] <= ASSOC_HOLD_SEC:
             if last_assoc["bbox"] is not None:
                 chosen = {
                     "bbox": last_assoc["bbox"],
@@ -78,7 +95,7 @@ def fuse_vision_ultrasonic(frame, candidates, ultrasonic_mm):
         return None
 
     # Save for temporal persistence
-    last_assoc["time"] = time.time()
+    last_assoc["time"] = now
     last_assoc["bbox"] = chosen["bbox"]
     last_assoc["centroid"] = chosen["centroid"]
 
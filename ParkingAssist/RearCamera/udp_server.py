@@ -1,3 +1,5 @@
+import os
+import select
 import socket
 import threading
 import time
@@ -5,34 +7,58 @@ import time
 UDP_IP = "127.0.0.1"
 UDP_PORT = 5005
 DISTANCE_TIMEOUT = 1.0  # seconds
+UDP_CPU = 3  # core for the listener thread (last core on a Pi 4); None = unpinned
 
 class DistanceReceiver:
     def __init__(self):
         self.distance_mm = None
-        self.last_update = 0
+        self.last_update = float("-inf")  # time.monotonic() of the last reading
         self.lock = threading.Lock()
 
         t = threading.Thread(target=self._listen, daemon=True)
         t.start()
 
     def _listen(self):
+        # Pin this thread (pid 0 = calling thread) away from the frame loop cores.
+        # Only cores this process may use (cgroup cpusets can hide some); a
+        # failed pin must not stop the listener, so it just runs unpinned.
+        if UDP_CPU is not None and UDP_CPU in os.sched_getaffinity(0):
+            try:
+                os.sched_setaffinity(0, {UDP_CPU})
+            except OSError as e:
+                print(f"UDP listener: CPU pin to {UDP_CPU} failed ({e}); running unpinned")
+
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.bind((UDP_IP, UDP_PORT))
-        sock.settimeout(1.0)
+        sock.setblocking(False)
+        poller = select.poll()
+        poller.register(sock, select.POLLIN)
 
         while True:
+            if not poller.poll(1000):
+                continue
+            # Drain everything queued; only the newest reading matters
+            last = None
+            while True:
+                try:
+                    last, _ = sock.recvfrom(128)
+                except BlockingIOError:
+                    break
+            if last is None:
+                continue
             try:
-                data, _ = sock.recvfrom(128)
-                s = data.decode("utf-8").strip()
-                d = int(s)
-                with self.lock:
-                    self.distance_mm = d
-                    self.last_update = time.time()
-            except:
-                pass
+                d = int(last)  # ASCII digits + "\n"; int() takes bytes, no decode/strip
+            except ValueError:
+                continue
+            with self.lock:
+                self.distance_mm = d
+                self.last_update = time.monotonic()
 
-    def get_distance(self):
+    def get_distance(self, now=None):
+        """Latest distance (mm), or None if older than DISTANCE_TIMEOUT. `now` is time.monotonic()."""
+        if now is None:
+            now = time.monotonic()
         with self.lock:
-            if (time.time() - self.last_update) > DISTANCE_TIMEOUT:
+            if (now - self.last_update) > DISTANCE_TIMEOUT:
                 return None
             return self.distance_mm